@@ -5,31 +5,148 @@ Handles HTTP requests and REAL SSE streaming for the connection management API
 import os
 import json
 import asyncio
-import threading
 import time
-import uuid
-from datetime import datetime
-from http.server import BaseHTTPRequestHandler
-import sys
-import io
-from contextlib import redirect_stdout, redirect_stderr
-from queue import Queue
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import orjson
+import asyncpg
 import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.exceptions import HTTPException
 
 # Load environment variables
 DATABASE_URL = os.getenv('DATABASE_URL')
 
-# Global event queue for SSE broadcasting
-event_queue = Queue()
-active_sse_connections = set()
+# Shared NEON connection pool (amortizes TCP+TLS+auth across requests)
+DB_POOL = None
+_db_pool_lock = asyncio.Lock()
+
+# Shared outbound HTTP client (keep-alive + HTTP/2 connection reuse)
+HTTPX_CLIENT = None
+
+# Active SSE connections; each one has its own outbox that broadcast_event() fills.
+# add/remove publish a new immutable _conn_snapshot, so readers iterate it without copying.
+_conn_list = []
+_conn_snapshot = ()
+SSE_HEARTBEAT_INTERVAL = 25.0  # seconds
+SSE_OUTBOX_SIZE = 1000  # events buffered for a client before it is treated as dead
+
+def add_sse_connection(conn):
+    """Register an SSE connection and publish a new snapshot"""
+    global _conn_snapshot
+    _conn_list.append(conn)
+    _conn_snapshot = tuple(_conn_list)
+
+def remove_sse_connection(conn):
+    """Unregister an SSE connection and publish a new snapshot"""
+    global _conn_snapshot
+    if conn in _conn_list:
+        _conn_list.remove(conn)
+        _conn_snapshot = tuple(_conn_list)
+
+async def get_client():
+    """Get the shared httpx client, creating it lazily"""
+    global HTTPX_CLIENT
+    # Everything runs on the server's event loop, so the check-and-create needs no lock
+    if HTTPX_CLIENT is None:
+        HTTPX_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30.0,
+            http2=True
+        )
+    return HTTPX_CLIENT
+
+async def close_client():
+    """Close the shared httpx client"""
+    global HTTPX_CLIENT
+    client, HTTPX_CLIENT = HTTPX_CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+async def init_db_connection(conn):
+    """Decode JSONB columns to Python objects on every pooled connection"""
+    await conn.set_type_codec('jsonb', encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+
+async def get_db_pool():
+    """Get the shared NEON connection pool, creating it on first use"""
+    global DB_POOL
+    if DB_POOL is not None:
+        return DB_POOL
 
-def get_db_connection():
-    """Get database connection to NEON"""
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable not set")
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    async with _db_pool_lock:
+        if DB_POOL is None:
+            DB_POOL = await asyncpg.create_pool(
+                DATABASE_URL,
+                min_size=1,
+                max_size=10,
+                # Prepared statements are cached per connection, so repeated queries skip parse/plan
+                statement_cache_size=100,
+                init=init_db_connection
+            )
+    return DB_POOL
+
+# Hot-path statements, kept as module constants so every caller sends the identical
+# query text and hits the same entry in each pooled connection's prepared-statement cache
+# Just the request columns, in a fixed order so callers can unpack by position
+GET_ENDPOINTS_SQL = """
+    SELECT source_method, source_url, source_headers, dest_method, dest_url, dest_headers
+    FROM connections WHERE id = $1
+"""
+CONNECTION_STATS_SQL = """
+    SELECT id, name, source_url, dest_url, created_at, last_executed,
+           execution_count, success_count, error_count
+    FROM connections WHERE id = $1
+"""
+
+# Pending execution results, folded into one UPDATE per flush by stats_writer()
+stats_queue = asyncio.Queue()
+STATS_FLUSH_INTERVAL = 0.1  # seconds
+
+stats_writer_task = None
+
+def record_execution(connection_id, status_code=None):
+    """Queue an execution result for the statistics writer (no status code means an error)"""
+    global stats_writer_task
+    # Started on first use: serverless runtimes may never deliver the lifespan startup event
+    if stats_writer_task is None or stats_writer_task.done():
+        stats_writer_task = asyncio.create_task(stats_writer())
+    stats_queue.put_nowait((connection_id, status_code))
+
+async def stats_writer():
+    """Background task that batches queued execution results into a single UPDATE"""
+    while True:
+        pending = [await stats_queue.get()]
+        await asyncio.sleep(STATS_FLUSH_INTERVAL)
+        while not stats_queue.empty():
+            pending.append(stats_queue.get_nowait())
+
+        # UPDATE ... FROM applies only one source row per target, so fold duplicates first
+        deltas = {}
+        for connection_id, status_code in pending:
+            executions, successes, errors = deltas.get(connection_id, (0, 0, 0))
+            if status_code is not None and status_code < 400:
+                successes += 1
+            else:
+                errors += 1
+            deltas[connection_id] = (executions + 1, successes, errors)
+
+        try:
+            pool = await get_db_pool()
+            await pool.execute("""
+                UPDATE connections
+                SET last_executed = NOW(),
+                    execution_count = execution_count + v.ec,
+                    success_count = success_count + v.sc,
+                    error_count = error_count + v.erc
+                FROM unnest($1::text[], $2::int[], $3::int[], $4::int[]) AS v(id, ec, sc, erc)
+                WHERE connections.id = v.id
+            """, list(deltas), *(list(column) for column in zip(*deltas.values())))
+        except Exception as e:
+            print(f"Failed to write execution statistics for {len(deltas)} connections: {e}")
 
 class ConnectionCreate:
     """Connection creation data model"""
@@ -46,206 +163,143 @@ class ConnectionCreate:
 
 async def create_connection(conn_data):
     """Create a new HTTP connection in database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        connection_id = str(uuid.uuid4())
-        cursor.execute("""
-            INSERT INTO connections (id, name, source_url, source_method, source_headers,
-                                   dest_url, dest_method, dest_headers, mapping_rules)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            connection_id,
-            conn_data.name,
-            conn_data.source_url,
-            conn_data.source_method,
-            json.dumps(conn_data.source_headers),
-            conn_data.dest_url,
-            conn_data.dest_method,
-            json.dumps(conn_data.dest_headers),
-            json.dumps(conn_data.mapping_rules)
-        ))
-
-        conn.commit()
-        return f"Connection created with ID: {connection_id}"
-
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    pool = await get_db_pool()
+    # The id is generated server-side; gen_random_uuid() is built in since Postgres 13
+    connection_id = await pool.fetchval("""
+        INSERT INTO connections (id, name, source_url, source_method, source_headers,
+                               dest_url, dest_method, dest_headers, mapping_rules)
+        VALUES (gen_random_uuid(), $1, $2, $3, $4, $5, $6, $7, $8)
+        RETURNING id
+    """,
+        conn_data.name,
+        conn_data.source_url,
+        conn_data.source_method,
+        conn_data.source_headers,
+        conn_data.dest_url,
+        conn_data.dest_method,
+        conn_data.dest_headers,
+        conn_data.mapping_rules
+    )
+
+    return f"Connection created with ID: {connection_id}"
 
 async def list_connections():
     """List all connections from database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute("""
-            SELECT id, name, source_url, dest_url, created_at, execution_count
-            FROM connections ORDER BY created_at DESC
-        """)
-
-        connections = cursor.fetchall()
-        result = "HTTP Connections:\n"
-        for row in connections:
-            result += f"- ID: {row['id']}, Name: {row['name']}, Source: {row['source_url']}, Dest: {row['dest_url']}, Executions: {row['execution_count']}\n"
-
-        return result if connections else "No connections found."
-
-    finally:
-        cursor.close()
-        conn.close()
+    pool = await get_db_pool()
+    # Postgres formats the listing and returns it as a single value instead of N rows
+    listing = await pool.fetchval("""
+        SELECT string_agg(
+            format('- ID: %s, Name: %s, Source: %s, Dest: %s, Executions: %s' || E'\\n',
+                   id, name, source_url, dest_url, execution_count),
+            '' ORDER BY created_at DESC)
+        FROM connections
+    """)
+
+    return "HTTP Connections:\n" + listing if listing else "No connections found."
 
 async def execute_connection(connection_id, custom_data=None):
     """Execute a connection"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    pool = await get_db_pool()
 
-    try:
-        # Get connection details
-        cursor.execute("SELECT * FROM connections WHERE id = %s", (connection_id,))
-        connection = cursor.fetchone()
-
-        if not connection:
-            return f"Connection {connection_id} not found"
-
-        # Execute source request
-        async with httpx.AsyncClient() as client:
-            source_response = await client.request(
-                method=connection['source_method'],
-                url=connection['source_url'],
-                headers=connection['source_headers'] or {}
-            )
+    # Get connection details
+    connection = await pool.fetchrow(GET_ENDPOINTS_SQL, connection_id)
 
-            source_data = source_response.json() if source_response.headers.get('content-type', '').startswith('application/json') else source_response.text
+    if not connection:
+        return f"Connection {connection_id} not found"
 
-        # Apply mapping rules (simplified)
-        dest_data = source_data
+    source_method, source_url, source_headers, dest_method, dest_url, dest_headers = connection
 
-        # Execute destination request
-        async with httpx.AsyncClient() as client:
+    try:
+        client = await get_client()
+
+        # Stream the source body straight into the destination request, 64 KiB at a time.
+        # Mapping rules are not applied yet, so the payload is forwarded unchanged.
+        async with client.stream(
+            method=source_method,
+            url=source_url,
+            headers=source_headers or {}
+        ) as source_response:
+            headers = dict(dest_headers or {})
+            content_type = source_response.headers.get('content-type')
+            if content_type and not any(name.lower() == 'content-type' for name in headers):
+                headers['Content-Type'] = content_type
+
+            # Execute destination request
             dest_response = await client.request(
-                method=connection['dest_method'],
-                url=connection['dest_url'],
-                headers=connection['dest_headers'] or {},
-                json=dest_data if isinstance(dest_data, dict) else None,
-                content=dest_data if not isinstance(dest_data, dict) else None
+                method=dest_method,
+                url=dest_url,
+                headers=headers,
+                content=source_response.aiter_bytes(65536)
             )
 
-        # Update statistics
-        cursor.execute("""
-            UPDATE connections
-            SET last_executed = NOW(),
-                execution_count = execution_count + 1,
-                success_count = success_count + CASE WHEN %s < 400 THEN 1 ELSE 0 END,
-                error_count = error_count + CASE WHEN %s >= 400 THEN 1 ELSE 0 END
-            WHERE id = %s
-        """, (dest_response.status_code, dest_response.status_code, connection_id))
-
-        conn.commit()
-
-        return f"Connection executed successfully. Source status: {source_response.status_code}, Destination status: {dest_response.status_code}"
-
     except Exception as e:
-        # Update error count
-        cursor.execute("""
-            UPDATE connections
-            SET last_executed = NOW(),
-                execution_count = execution_count + 1,
-                error_count = error_count + 1
-            WHERE id = %s
-        """, (connection_id,))
-        conn.commit()
+        # Count as an error
+        record_execution(connection_id)
         raise e
-    finally:
-        cursor.close()
-        conn.close()
+
+    # Update statistics
+    record_execution(connection_id, dest_response.status_code)
+
+    return f"Connection executed successfully. Source status: {source_response.status_code}, Destination status: {dest_response.status_code}"
 
 async def test_connection(connection_id):
     """Test a connection by making requests to both endpoints"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    pool = await get_db_pool()
+    connection = await pool.fetchrow(GET_ENDPOINTS_SQL, connection_id)
 
-    try:
-        cursor.execute("SELECT * FROM connections WHERE id = %s", (connection_id,))
-        connection = cursor.fetchone()
+    if not connection:
+        return f"Connection {connection_id} not found"
 
-        if not connection:
-            return f"Connection {connection_id} not found"
+    source_method, source_url, source_headers, dest_method, dest_url, dest_headers = connection
 
-        results = []
+    results = []
+    client = await get_client()
 
-        # Test source endpoint
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.request(
-                    method=connection['source_method'],
-                    url=connection['source_url'],
-                    headers=connection['source_headers'] or {}
-                )
-            results.append(f"Source endpoint: {response.status_code} - {'OK' if response.status_code < 400 else 'ERROR'}")
-        except Exception as e:
-            results.append(f"Source endpoint: ERROR - {str(e)}")
-
-        # Test destination endpoint (with dummy data)
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.request(
-                    method=connection['dest_method'],
-                    url=connection['dest_url'],
-                    headers=connection['dest_headers'] or {},
-                    json={"test": "data"}
-                )
-            results.append(f"Destination endpoint: {response.status_code} - {'OK' if response.status_code < 400 else 'ERROR'}")
-        except Exception as e:
-            results.append(f"Destination endpoint: ERROR - {str(e)}")
+    # Test source endpoint
+    try:
+        response = await client.request(
+            method=source_method,
+            url=source_url,
+            headers=source_headers or {},
+            timeout=10.0
+        )
+        results.append(f"Source endpoint: {response.status_code} - {'OK' if response.status_code < 400 else 'ERROR'}")
+    except Exception as e:
+        results.append(f"Source endpoint: ERROR - {str(e)}")
 
-        return f"Connection test results:\n" + "\n".join(results)
+    # Test destination endpoint (with dummy data)
+    try:
+        response = await client.request(
+            method=dest_method,
+            url=dest_url,
+            headers=dest_headers or {},
+            json={"test": "data"},
+            timeout=10.0
+        )
+        results.append(f"Destination endpoint: {response.status_code} - {'OK' if response.status_code < 400 else 'ERROR'}")
+    except Exception as e:
+        results.append(f"Destination endpoint: ERROR - {str(e)}")
 
-    finally:
-        cursor.close()
-        conn.close()
+    return f"Connection test results:\n" + "\n".join(results)
 
 async def delete_connection(connection_id):
     """Delete a connection from database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute("DELETE FROM connections WHERE id = %s", (connection_id,))
-        if cursor.rowcount > 0:
-            conn.commit()
-            return f"Connection {connection_id} deleted successfully"
-        else:
-            return f"Connection {connection_id} not found"
-
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    pool = await get_db_pool()
+    status = await pool.execute("DELETE FROM connections WHERE id = $1", connection_id)
+    if status != "DELETE 0":
+        return f"Connection {connection_id} deleted successfully"
+    else:
+        return f"Connection {connection_id} not found"
 
 async def get_connection_stats(connection_id):
     """Get detailed statistics for a connection"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    pool = await get_db_pool()
+    connection = await pool.fetchrow(CONNECTION_STATS_SQL, connection_id)
 
-    try:
-        cursor.execute("""
-            SELECT id, name, source_url, dest_url, created_at, last_executed,
-                   execution_count, success_count, error_count
-            FROM connections WHERE id = %s
-        """, (connection_id,))
+    if not connection:
+        return f"Connection {connection_id} not found"
 
-        connection = cursor.fetchone()
-        if not connection:
-            return f"Connection {connection_id} not found"
-
-        stats = f"""Connection Statistics:
+    stats = f"""Connection Statistics:
 ID: {connection['id']}
 Name: {connection['name']}
 Source URL: {connection['source_url']}
@@ -258,80 +312,66 @@ Failed Executions: {connection['error_count']}
 Success Rate: {(connection['success_count'] / connection['execution_count'] * 100) if connection['execution_count'] > 0 else 0:.1f}%
 """
 
-        return stats
+    return stats
+
+# Last formatted timestamp, reused while it is less than 0.1s old
+_ts_cache = [0.0, ""]
 
-    finally:
-        cursor.close()
-        conn.close()
+def now_iso():
+    """Current UTC time as an ISO 8601 string, cached across a burst of events"""
+    t = time.time()
+    if t - _ts_cache[0] > 0.1:
+        _ts_cache[0] = t
+        _ts_cache[1] = datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+    return _ts_cache[1]
 
-# Global event queue for SSE broadcasting
-event_queue = Queue()
-active_sse_connections = set()
+def sse_frame(event_data):
+    """Encode one SSE data frame"""
+    return b"data: " + orjson.dumps(event_data) + b"\n\n"
 
 class SSEConnection:
-    """Real SSE connection handler with robust error handling"""
-    def __init__(self, handler):
-        self.handler = handler
+    """Real SSE connection; stream() feeds the StreamingResponse for one client"""
+    def __init__(self):
         self.active = True
         self.last_heartbeat = time.time()
         self.created_at = time.time()
         self.events_sent = 0
-        self.lock = threading.Lock()
-
-    def send_event(self, event_data):
-        """Send an SSE event with error handling"""
-        if not self.active:
-            return False
+        self.outbox = asyncio.Queue(maxsize=SSE_OUTBOX_SIZE)  # encoded frames from broadcast_event()
 
+    async def stream(self):
+        """Yield the connected event, then queued events as they arrive, heartbeats when idle"""
+        add_sse_connection(self)
         try:
-            with self.lock:
-                if not self.active:  # Double-check after acquiring lock
-                    return False
+            # Send initial connected event
+            yield sse_frame({
+                "type": "connected",
+                "message": "SSE connection established",
+                "timestamp": now_iso()
+            })
+            self.events_sent += 1
 
-                event_str = f"data: {json.dumps(event_data)}\n\n"
-                self.handler.wfile.write(event_str.encode('utf-8'))
-                self.handler.wfile.flush()
+            while self.active:
+                try:
+                    frame = await asyncio.wait_for(self.outbox.get(), timeout=SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Send periodic heartbeat to keep the connection alive
+                    yield sse_frame({'type': 'heartbeat', 'timestamp': now_iso()})
+                    continue
+
+                # Coalesce whatever else is already queued into the same chunk, so a
+                # burst of broadcasts goes out as one transport write instead of one per event
+                frames = [frame]
+                while not self.outbox.empty():
+                    frames.append(self.outbox.get_nowait())
+
+                yield b"".join(frames)
                 self.last_heartbeat = time.time()
-                self.events_sent += 1
-                return True
-
-        except (BrokenPipeError, ConnectionResetError, OSError) as e:
-            print(f"SSE connection broken: {e}")
-            self.active = False
-            return False
-        except Exception as e:
-            print(f"SSE send error: {e}")
-            self.active = False
-            return False
-
-    def send_heartbeat(self):
-        """Send heartbeat to keep connection alive"""
-        if not self.active:
-            return False
-
-        try:
-            with self.lock:
-                if not self.active:
-                    return False
-
-                heartbeat = f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
-                self.handler.wfile.write(heartbeat.encode('utf-8'))
-                self.handler.wfile.flush()
-                return True
-
-        except (BrokenPipeError, ConnectionResetError, OSError) as e:
-            print(f"SSE heartbeat failed: {e}")
-            self.active = False
-            return False
-        except Exception as e:
-            print(f"SSE heartbeat error: {e}")
-            self.active = False
-            return False
+                self.events_sent += len(frames)
 
-    def close(self):
-        """Explicitly close the connection"""
-        with self.lock:
+        finally:
+            # Client went away or the server is shutting down
             self.active = False
+            remove_sse_connection(self)
 
     def get_stats(self):
         """Get connection statistics"""
@@ -343,301 +383,162 @@ class SSEConnection:
             "age_seconds": time.time() - self.created_at
         }
 
-def sse_broadcaster():
-    """Background thread that broadcasts events to all SSE connections with robust error handling"""
-    while True:
-        try:
-            # Get event from queue with timeout
-            event_data = event_queue.get(timeout=1.0)
-
-            # Broadcast to all active connections
-            dead_connections = []
-            active_count = 0
-
-            for conn in active_sse_connections.copy():
-                try:
-                    if conn.send_event(event_data):
-                        active_count += 1
-                    else:
-                        dead_connections.append(conn)
-                except Exception as e:
-                    print(f"Error broadcasting to connection: {e}")
-                    dead_connections.append(conn)
-
-            # Remove dead connections
-            for conn in dead_connections:
-                active_sse_connections.discard(conn)
-
-            print(f"Broadcasted event '{event_data.get('type', 'unknown')}' to {active_count} active connections")
-
-        except:
-            # Queue timeout - perform maintenance
-            dead_connections = []
-            current_time = time.time()
-            active_count = 0
-
-            for conn in active_sse_connections.copy():
-                try:
-                    # Check if connection is too old
-                    if current_time - conn.last_heartbeat > 300:  # 5 minute timeout
-                        print("Connection timed out, removing")
-                        dead_connections.append(conn)
-                    else:
-                        # Send heartbeat and count as active if successful
-                        if conn.send_heartbeat():
-                            active_count += 1
-                        else:
-                            dead_connections.append(conn)
-                except Exception as e:
-                    print(f"Error during maintenance: {e}")
-                    dead_connections.append(conn)
-
-            # Remove dead connections
-            for conn in dead_connections:
-                active_sse_connections.discard(conn)
-
-            if active_count > 0:
-                print(f"SSE maintenance: {active_count} active connections, removed {len(dead_connections)} dead connections")
-
-# Start the broadcaster thread
-broadcaster_thread = threading.Thread(target=sse_broadcaster, daemon=True)
-broadcaster_thread.start()
-
 def broadcast_event(event_type, data):
     """Broadcast an event to all SSE clients"""
     event_data = {
         "type": event_type,
         "data": data,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso()
     }
-    event_queue.put(event_data)
-
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        """Handle GET requests"""
-        try:
-            path = self.path
-
-            # CORS headers
-            self.send_cors_headers()
-
-            if path == "/":
-                self.send_json_response({"message": "HTTP Connection Manager API", "version": "1.0.0"})
-                return
-
-            elif path == "/api/connections":
-                # List connections
-                result = asyncio.run(list_connections())
-                self.send_json_response({"result": result})
-
-            elif path.startswith("/api/connections/") and "/test" in path:
-                # Test connection
-                connection_id = path.split("/api/connections/")[1].split("/test")[0]
-                result = asyncio.run(test_connection(connection_id))
-                broadcast_event("connection_tested", {"connection_id": connection_id, "result": result})
-                self.send_json_response({"result": result})
-
-            elif path.startswith("/api/connections/") and "/stats" in path:
-                # Get connection stats
-                connection_id = path.split("/api/connections/")[1].split("/stats")[0]
-                result = asyncio.run(get_connection_stats(connection_id))
-                self.send_json_response({"result": result})
-
-            elif path == "/status":
-                # Real-time system status
-                status_data = {
-                    "active_sse_connections": len(active_sse_connections),
-                    "total_events_queued": event_queue.qsize(),
-                    "broadcaster_thread_alive": broadcaster_thread.is_alive(),
-                    "database_url_configured": bool(DATABASE_URL),
-                    "timestamp": datetime.now().isoformat()
-                }
-
-                # Add connection details
-                connections_info = []
-                for i, conn in enumerate(active_sse_connections):
-                    stats = conn.get_stats()
-                    connections_info.append({
-                        "id": i + 1,
-                        "active": stats["active"],
-                        "age_seconds": stats["age_seconds"],
-                        "events_sent": stats["events_sent"],
-                        "last_heartbeat": stats["last_heartbeat"]
-                    })
-
-                status_data["connections"] = connections_info
-                self.send_json_response(status_data)
-
-            elif path == "/events":
-                # REAL SSE endpoint - keeps connection open and streams events
-                self.handle_sse_connection()
-
-            else:
-                self.send_error_response(404, "Not found")
 
-        except Exception as e:
-            self.send_error_response(500, str(e))
-
-    def handle_sse_connection(self):
-        """Handle real SSE connection that stays open and streams events"""
-        # Send SSE headers
-        self.send_response(200)
-        self.send_header('Content-Type', 'text/event-stream')
-        self.send_header('Cache-Control', 'no-cache')
-        self.send_header('Connection', 'keep-alive')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Headers', 'Cache-Control')
-        self.end_headers()
-
-        # Create SSE connection
-        sse_conn = SSEConnection(self)
-        active_sse_connections.add(sse_conn)
-
-        try:
-            # Send initial connected event
-            sse_conn.send_event({
-                "type": "connected",
-                "message": "SSE connection established",
-                "timestamp": datetime.now().isoformat()
-            })
-
-            # Keep connection open and stream events with proper keep-alive
-            while sse_conn.active:
-                try:
-                    # Check connection health every 5 seconds
-                    time.sleep(5.0)
-
-                    # Send periodic heartbeat to detect broken connections
-                    if not sse_conn.send_heartbeat():
-                        print("Heartbeat failed, closing SSE connection")
-                        break
-
-                    # Check if client has sent any data (indicating they might want to close)
-                    # This is a more sophisticated keep-alive check
-                    try:
-                        # Non-blocking check for client data
-                        import select
-                        if hasattr(self.connection, 'fileno'):
-                            ready, _, _ = select.select([self.connection], [], [], 0)
-                            if ready:
-                                # Client sent data, check if it's a disconnect signal
-                                peek_data = self.rfile.peek(1)
-                                if not peek_data:
-                                    print("Client disconnected (empty peek)")
-                                    break
-                    except:
-                        # select not available or connection check failed
-                        pass
-
-                except Exception as e:
-                    print(f"SSE connection error: {e}")
-                    break
-
-        except Exception as e:
-            print(f"SSE handler error: {e}")
-        finally:
-            # Remove connection when done
-            active_sse_connections.discard(sse_conn)
-
-    def do_POST(self):
-        """Handle POST requests"""
+    # Serialize once and hand the same frame to each connection's outbox; its stream wakes up and sends it
+    frame = sse_frame(event_data)
+    for conn in _conn_snapshot:
         try:
-            path = self.path
-            self.send_cors_headers()
-
-            if path == "/api/connections":
-                # Create connection
-                content_length = int(self.headers.get('Content-Length', 0))
-                post_data = self.rfile.read(content_length).decode('utf-8')
-                data = json.loads(post_data)
-
-                conn_data = ConnectionCreate(**data)
-                result = asyncio.run(create_connection(conn_data))
-
-                # Broadcast real event to SSE clients
-                broadcast_event("connection_created", {
-                    "connection_id": result.split("ID: ")[-1] if "ID: " in result else "unknown",
-                    "name": data.get('name'),
-                    "source_url": data.get('source_url'),
-                    "dest_url": data.get('dest_url')
-                })
-
-                self.send_json_response({"result": result})
-
-            elif path.startswith("/api/connections/") and "/execute" in path:
-                # Execute connection
-                connection_id = path.split("/api/connections/")[1].split("/execute")[0]
-                result = asyncio.run(execute_connection(connection_id, None))
-
-                # Broadcast real event to SSE clients
-                broadcast_event("connection_executed", {
-                    "connection_id": connection_id,
-                    "result": result,
-                    "timestamp": datetime.now().isoformat()
-                })
-
-                self.send_json_response({"result": result})
-
-            else:
-                self.send_error_response(404, "Not found")
-
-        except Exception as e:
-            self.send_error_response(500, str(e))
-
-    def do_DELETE(self):
-        """Handle DELETE requests"""
-        try:
-            path = self.path
-            self.send_cors_headers()
-
-            if path.startswith("/api/connections/"):
-                # Delete connection
-                connection_id = path.split("/api/connections/")[1]
-                result = asyncio.run(delete_connection(connection_id))
-
-                # Broadcast real event to SSE clients
-                broadcast_event("connection_deleted", {
-                    "connection_id": connection_id,
-                    "result": result
-                })
-
-                self.send_json_response({"result": result})
-
-            else:
-                self.send_error_response(404, "Not found")
+            conn.outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            # The client has stopped reading; drop it rather than buffer forever
+            conn.active = False
+            remove_sse_connection(conn)
+
+@asynccontextmanager
+async def lifespan(app):
+    """Release the shared clients when the server shuts down"""
+    yield
+    if stats_writer_task is not None:
+        stats_writer_task.cancel()
+    await close_client()
+    if DB_POOL is not None:
+        await DB_POOL.close()
+
+# Create FastAPI app
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization", "Cache-Control"],
+)
+
+@app.exception_handler(HTTPException)
+async def http_error_response(request: Request, exc: HTTPException):
+    """Send error response"""
+    return ORJSONResponse(status_code=exc.status_code, content={"error": exc.detail})
+
+@app.exception_handler(Exception)
+async def server_error_response(request: Request, exc: Exception):
+    """Send error response for unhandled exceptions"""
+    # Starlette runs this handler outside CORSMiddleware, so the CORS header is added here;
+    # without it the browser hides the error body behind a CORS failure
+    return ORJSONResponse(
+        status_code=500,
+        content={"error": str(exc)},
+        headers={"Access-Control-Allow-Origin": "*"}
+    )
+
+@app.get("/")
+async def root():
+    """Root endpoint"""
+    return {"message": "HTTP Connection Manager API", "version": "1.0.0"}
+
+@app.get("/api/connections")
+async def list_connections_endpoint():
+    """List connections"""
+    result = await list_connections()
+    return {"result": result}
+
+@app.post("/api/connections")
+async def create_connection_endpoint(request: Request):
+    """Create connection"""
+    # orjson parses the raw body bytes directly, no separate decode pass
+    data = orjson.loads(await request.body())
+
+    conn_data = ConnectionCreate(**data)
+    result = await create_connection(conn_data)
+
+    # Broadcast real event to SSE clients
+    broadcast_event("connection_created", {
+        "connection_id": result.split("ID: ")[-1] if "ID: " in result else "unknown",
+        "name": data.get('name'),
+        "source_url": data.get('source_url'),
+        "dest_url": data.get('dest_url')
+    })
+
+    return {"result": result}
+
+@app.get("/api/connections/{connection_id}/test")
+async def test_connection_endpoint(connection_id: str):
+    """Test connection"""
+    result = await test_connection(connection_id)
+    broadcast_event("connection_tested", {"connection_id": connection_id, "result": result})
+    return {"result": result}
+
+@app.get("/api/connections/{connection_id}/stats")
+async def connection_stats_endpoint(connection_id: str):
+    """Get connection stats"""
+    result = await get_connection_stats(connection_id)
+    return {"result": result}
+
+@app.post("/api/connections/{connection_id}/execute")
+async def execute_connection_endpoint(connection_id: str):
+    """Execute connection"""
+    result = await execute_connection(connection_id, None)
+
+    # Broadcast real event to SSE clients
+    broadcast_event("connection_executed", {
+        "connection_id": connection_id,
+        "result": result,
+        "timestamp": now_iso()
+    })
+
+    return {"result": result}
+
+@app.delete("/api/connections/{connection_id}")
+async def delete_connection_endpoint(connection_id: str):
+    """Delete connection"""
+    result = await delete_connection(connection_id)
+
+    # Broadcast real event to SSE clients
+    broadcast_event("connection_deleted", {
+        "connection_id": connection_id,
+        "result": result
+    })
+
+    return {"result": result}
+
+@app.get("/status")
+async def status():
+    """Real-time system status"""
+    connections = _conn_snapshot
+    status_data = {
+        "active_sse_connections": len(connections),
+        "total_events_queued": sum(conn.outbox.qsize() for conn in connections),
+        "database_url_configured": bool(DATABASE_URL),
+        "timestamp": now_iso()
+    }
 
-        except Exception as e:
-            self.send_error_response(500, str(e))
-
-    def do_OPTIONS(self):
-        """Handle OPTIONS requests for CORS"""
-        self.send_cors_headers()
-        self.end_headers()
-
-    def send_cors_headers(self):
-        """Send CORS headers"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.send_header('Content-Type', 'application/json')
-
-    def send_json_response(self, data):
-        """Send JSON response"""
-        response = json.dumps(data)
-        self.send_header('Content-Length', str(len(response)))
-        self.end_headers()
-        self.wfile.write(response.encode('utf-8'))
-
-    def send_error_response(self, code, message):
-        """Send error response"""
-        self.send_response(code)
-        self.send_header('Content-Type', 'application/json')
-        error_data = json.dumps({"error": message})
-        self.send_header('Content-Length', str(len(error_data)))
-        self.end_headers()
-        self.wfile.write(error_data.encode('utf-8'))
-
-    def log_message(self, format, *args):
-        """Override to prevent logging to stderr"""
-        pass
\ No newline at end of file
+    # Add connection details
+    connections_info = []
+    for i, conn in enumerate(connections):
+        stats = conn.get_stats()
+        connections_info.append({
+            "id": i + 1,
+            "active": stats["active"],
+            "age_seconds": stats["age_seconds"],
+            "events_sent": stats["events_sent"],
+            "last_heartbeat": stats["last_heartbeat"]
+        })
+
+    status_data["connections"] = connections_info
+    return status_data
+
+@app.get("/events")
+async def events():
+    """REAL SSE endpoint - keeps connection open and streams events"""
+    return StreamingResponse(
+        SSEConnection().stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+    )
@@ -3,46 +3,62 @@
 Simple MCP client to test the HTTP Connection Manager server
 """
 import asyncio
-import json
+import orjson
 import sys
-import subprocess
-import threading
 import time
 from typing import Dict, Any
 
+# Use uvloop where it is available (it does not support Windows); plain asyncio otherwise
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
 class MCPClient:
     def __init__(self, server_command: list):
         self.server_command = server_command
         self.process = None
-        self.response_queue = asyncio.Queue()
+        self._reader = None
+        # Requests awaiting a reply, keyed by JSON-RPC id
+        self._pending: Dict[Any, asyncio.Future] = {}
 
     async def start_server(self):
         """Start the MCP server process"""
-        self.process = subprocess.Popen(
-            self.server_command,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
+        self.process = await asyncio.create_subprocess_exec(
+            *self.server_command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=2**20
         )
 
-        # Start reading stdout in a separate thread
-        threading.Thread(target=self._read_stdout, daemon=True).start()
+        # Read stdout on the event loop, no helper thread needed
+        self._reader = asyncio.create_task(self._reader_loop())
 
-    def _read_stdout(self):
+    async def _reader_loop(self):
         """Read server stdout and put responses in queue"""
-        while self.process and self.process.poll() is None:
-            line = self.process.stdout.readline()
-            if line.strip():
-                try:
-                    response = json.loads(line.strip())
-                    asyncio.run_coroutine_threadsafe(
-                        self.response_queue.put(response),
-                        asyncio.get_event_loop()
-                    )
-                except json.JSONDecodeError:
-                    print(f"Invalid JSON response: {line.strip()}")
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break  # EOF, the server exited
+            line = line.rstrip()
+            # A complete JSON-RPC message ends in } or ]; skip fragments and log noise unparsed
+            if not line or line[-1] not in b"}]":
+                continue
+            try:
+                # orjson parses the raw bytes, no text decoding on the way in
+                response = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                print(f"Invalid JSON response: {line.decode(errors='replace')}")
+                continue
+
+            # Hand the reply to whoever sent the matching request; notifications have no id
+            if isinstance(response, dict):
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
 
     async def send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Send a request to the server and wait for response"""
@@ -50,25 +66,56 @@ class MCPClient:
             raise RuntimeError("Server not started")
 
         # Send request
-        request_json = json.dumps(request) + "\n"
-        self.process.stdin.write(request_json)
-        self.process.stdin.flush()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["id"]] = future
+
+        # orjson emits UTF-8 bytes directly, no str intermediate to encode
+        self.process.stdin.write(orjson.dumps(request) + b"\n")
+        await self.process.stdin.drain()
 
         # Wait for response
         try:
-            response = await asyncio.wait_for(self.response_queue.get(), timeout=30.0)
-            return response
+            return await asyncio.wait_for(future, timeout=30.0)
         except asyncio.TimeoutError:
             raise RuntimeError("Timeout waiting for server response")
+        finally:
+            self._pending.pop(request["id"], None)
 
     async def close(self):
         """Close the server process"""
         if self.process:
-            self.process.terminate()
-            try:
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.process.kill()
+            if self.process.returncode is None:
+                self.process.terminate()
+                try:
+                    await asyncio.wait_for(self.process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    self.process.kill()
+                    await self.process.wait()
+            if self._reader:
+                self._reader.cancel()
+
+# Fixture connections bulk-inserted before the tool calls, so list_connections runs against a populated table
+SEED_CONNECTIONS = 100
+
+async def seed_connections(count: int):
+    """Insert fixture connections with the server's internal COPY helper; returns (pool, ids)"""
+    # Imported here: it needs DATABASE_URL and the server's dependencies, like the server process
+    import server
+
+    pool = await server.create_db_pool()
+    rows = [
+        (f"Seed Connection {i}", "https://httpbin.org/get", "GET", None,
+         "https://httpbin.org/post", "POST", None, [])
+        for i in range(count)
+    ]
+    return pool, await server._bulk_create_connections(pool, rows)
+
+async def remove_seed_connections(pool, connection_ids: list):
+    """Delete the fixture connections and close the setup pool"""
+    try:
+        await pool.execute("DELETE FROM connections WHERE id = ANY($1::text[])", connection_ids)
+    finally:
+        await pool.close()
 
 async def test_mcp_server():
     """Test the MCP server with various tool calls"""
@@ -77,12 +124,10 @@ async def test_mcp_server():
     # Start the server
     client = MCPClient(["uv", "run", "python", "server.py"])
     await client.start_server()
-
-    # Wait a moment for server to initialize
-    await asyncio.sleep(2)
+    seed = None
 
     try:
-        # Test 1: Initialize connection
+        # Test 1: Initialize connection (sent right away, the server's reply is the readiness signal)
         print("1. Testing initialize...")
         init_request = {
             "jsonrpc": "2.0",
@@ -100,6 +145,10 @@ async def test_mcp_server():
         response = await client.send_request(init_request)
         print(f"✅ Initialize response: {response}")
 
+        # Setup: the server has created the tables by the time it answers initialize
+        seed = await seed_connections(SEED_CONNECTIONS)
+        print(f"📝 Seeded {len(seed[1])} connections")
+
         # Test 2: List tools
         print("\n2. Testing tools/list...")
         tools_request = {
@@ -227,7 +276,12 @@ async def test_mcp_server():
     except Exception as e:
         print(f"❌ Test failed: {e}")
     finally:
-        await client.close()
+        # The server process is terminated even if the fixture cleanup fails
+        try:
+            if seed is not None:
+                await remove_seed_connections(*seed)
+        finally:
+            await client.close()
 
 if __name__ == "__main__":
     asyncio.run(test_mcp_server())
\ No newline at end of file
@@ -4,217 +4,330 @@ Just like the Zapier example - clean and minimal
 """
 
 import os
+import sys
 import json
 import asyncio
+import itertools
+import secrets
+from contextlib import asynccontextmanager
 from datetime import datetime
 import httpx
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import asyncpg
+from jsonpath_ng.ext import parse as parse_jsonpath
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
+# Use uvloop where it is available (it does not support Windows); plain asyncio otherwise
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
 # Load environment variables
 load_dotenv()
 
-# Initialize MCP server
-mcp = FastMCP("HTTP Connection Manager")
-
-# Database connection
-def get_db_connection():
-    """Get database connection to NEON"""
-    database_url = os.getenv('DATABASE_URL')
-    if not database_url:
-        raise ValueError("DATABASE_URL environment variable not set")
-    return psycopg2.connect(database_url, cursor_factory=RealDictCursor)
-
-def init_database():
+# Read once at import: the server cannot do anything useful without a database
+DATABASE_URL = os.getenv('DATABASE_URL')
+if not DATABASE_URL:
+    raise ValueError("DATABASE_URL environment variable not set")
+
+# Shared HTTP client, reused by every tool call (keep-alive + HTTP/2)
+_http = httpx.AsyncClient(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=500)
+)
+
+# Shared NEON connection pool, opened by the server lifespan
+_pool = None
+
+# Compiled mapping rules per connection id, as (mapping_rules, [(expression, dest_field), ...]);
+# an entry is recompiled whenever the row's mapping_rules differ from the ones it was built from
+_rules_cache: dict[str, tuple[list, list]] = {}
+
+# Per-process sequence for connection ids; the random suffix keeps ids unique across restarts
+_id_counter = itertools.count()
+
+# Tool statements, defined once so each pooled connection prepares them once and
+# reuses the cached plan afterwards (see statement_cache_size in create_db_pool)
+_STMT_INSERT = """
+    INSERT INTO connections (id, name, source_url, source_method, source_headers,
+                             dest_url, dest_method, dest_headers, mapping_rules)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+"""
+_STMT_LIST = "SELECT id, name, source_url, dest_url FROM connections ORDER BY created_at DESC"
+_STMT_BEGIN_EXECUTION = """
+    UPDATE connections
+    SET execution_count = execution_count + 1
+    WHERE id = $1
+    RETURNING *
+"""
+_STMT_UPDATE_STATS = """
+    UPDATE connections
+    SET last_executed = NOW(),
+        success_count = success_count + $1,
+        error_count = error_count + $2
+    WHERE id = $3
+"""
+_STMT_DELETE = "DELETE FROM connections WHERE id = $1"
+
+# Columns written by _bulk_create_connections, in record order
+_BULK_COLUMNS = (
+    "id", "name", "source_url", "source_method", "source_headers",
+    "dest_url", "dest_method", "dest_headers", "mapping_rules"
+)
+
+async def init_db_connection(conn):
+    """Decode JSONB columns to Python objects on every pooled connection"""
+    # Binary format (a version byte, then the JSON text) so JSONB also works with COPY
+    await conn.set_type_codec(
+        'jsonb',
+        encoder=lambda value: b'\x01' + json.dumps(value).encode(),
+        decoder=lambda data: json.loads(data[1:]),
+        schema='pg_catalog',
+        format='binary'
+    )
+
+async def create_db_pool():
+    """Create the connection pool to NEON"""
+    return await asyncpg.create_pool(
+        DATABASE_URL,
+        min_size=4,
+        max_size=32,
+        statement_cache_size=256,
+        init=init_db_connection
+    )
+
+async def init_database():
     """Initialize database tables"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        # Create connections table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS connections (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                source_url TEXT NOT NULL,
-                source_method TEXT NOT NULL DEFAULT 'GET',
-                source_headers JSONB,
-                dest_url TEXT NOT NULL,
-                dest_method TEXT NOT NULL DEFAULT 'POST',
-                dest_headers JSONB,
-                mapping_rules JSONB DEFAULT '[]'::jsonb,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_executed TIMESTAMP,
-                execution_count INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0,
-                error_count INTEGER DEFAULT 0
-            )
-        ''')
-
-        # Create execution logs table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS execution_logs (
-                id SERIAL PRIMARY KEY,
-                connection_id TEXT REFERENCES connections(id),
-                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                success BOOLEAN NOT NULL,
-                source_response JSONB,
-                dest_response JSONB,
-                error_message TEXT,
-                execution_time_ms INTEGER
-            )
-        ''')
+        async with _pool.acquire() as conn:
+            async with conn.transaction():
+                # Create connections table
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS connections (
+                        id TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        source_url TEXT NOT NULL,
+                        source_method TEXT NOT NULL DEFAULT 'GET',
+                        source_headers JSONB,
+                        dest_url TEXT NOT NULL,
+                        dest_method TEXT NOT NULL DEFAULT 'POST',
+                        dest_headers JSONB,
+                        mapping_rules JSONB DEFAULT '[]'::jsonb,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_executed TIMESTAMP,
+                        execution_count INTEGER DEFAULT 0,
+                        success_count INTEGER DEFAULT 0,
+                        error_count INTEGER DEFAULT 0
+                    )
+                ''')
+
+                # Create execution logs table
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS execution_logs (
+                        id SERIAL PRIMARY KEY,
+                        connection_id TEXT REFERENCES connections(id),
+                        executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        success BOOLEAN NOT NULL,
+                        source_response JSONB,
+                        dest_response JSONB,
+                        error_message TEXT,
+                        execution_time_ms INTEGER
+                    )
+                ''')
+
+                # list_connections orders by created_at; per-connection log lookups go newest first
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_connections_created_at ON connections (created_at DESC)"
+                )
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_execution_logs_conn ON execution_logs (connection_id, executed_at DESC)"
+                )
 
-        conn.commit()
         print("✅ Database initialized")
 
     except Exception as e:
         print(f"❌ Database init failed: {e}")
-        conn.rollback()
+
+@asynccontextmanager
+async def lifespan(server):
+    """Open the database pool on startup; close shared clients when the server stops"""
+    global _pool
+    _pool = await create_db_pool()
+    try:
+        # Initialize database
+        await init_database()
+        yield
     finally:
-        cursor.close()
-        conn.close()
+        await _pool.close()
+        await _http.aclose()
+
+# Initialize MCP server
+mcp = FastMCP("HTTP Connection Manager", lifespan=lifespan)
 
 @mcp.tool()
 async def create_connection(name: str, source_url: str, dest_url: str,
                           source_method: str = "GET", dest_method: str = "POST",
-                          source_headers: str = None, dest_headers: str = None) -> str:
+                          source_headers: str = None, dest_headers: str = None,
+                          mapping_rules: str = None) -> str:
     """Create a new HTTP connection between endpoints"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        connection_id = f"conn_{int(asyncio.get_event_loop().time() * 1000)}"
+        connection_id = f"conn_{next(_id_counter):x}_{secrets.token_hex(4)}"
 
-        cursor.execute("""
-            INSERT INTO connections (id, name, source_url, source_method, source_headers,
-                                   dest_url, dest_method, dest_headers)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
+        await _pool.execute(_STMT_INSERT,
             connection_id, name, source_url, source_method,
-            source_headers, dest_url, dest_method, dest_headers
-        ))
+            # Headers arrive as JSON strings; the JSONB codec expects Python objects
+            json.loads(source_headers) if source_headers else None,
+            dest_url, dest_method,
+            json.loads(dest_headers) if dest_headers else None,
+            json.loads(mapping_rules) if mapping_rules else []
+        )
 
-        conn.commit()
         return f"Connection created: {connection_id}"
 
     except Exception as e:
-        conn.rollback()
         return f"Error creating connection: {str(e)}"
-    finally:
-        cursor.close()
-        conn.close()
 
-@mcp.tool()
-async def list_connections() -> str:
-    """List all HTTP connections"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def _format_connection(row):
+    """One list_connections line; row columns are (id, name, source_url, dest_url)"""
+    return f"- {row[0]}: {row[1]} ({row[2]} -> {row[3]})\n"
 
-    try:
-        cursor.execute("SELECT id, name, source_url, dest_url FROM connections ORDER BY created_at DESC")
-        connections = cursor.fetchall()
+async def _bulk_create_connections(pool, rows):
+    """Insert many connections with one COPY (test setup; not exposed as a tool); rows are
+    (name, source_url, source_method, source_headers, dest_url, dest_method, dest_headers,
+    mapping_rules) tuples"""
+    connection_ids = []
+    records = []
+    for row in rows:
+        connection_id = f"conn_{next(_id_counter):x}_{secrets.token_hex(4)}"
+        connection_ids.append(connection_id)
+        records.append((connection_id, *row))
 
-        if not connections:
-            return "No connections found"
+    async with pool.acquire() as conn:
+        await conn.copy_records_to_table("connections", records=records, columns=_BULK_COLUMNS)
 
-        result = "HTTP Connections:\n"
-        for row in connections:
-            result += f"- {row['id']}: {row['name']} ({row['source_url']} -> {row['dest_url']})\n"
+    return connection_ids
 
-        return result
-
-    finally:
-        cursor.close()
-        conn.close()
+@mcp.tool()
+async def list_connections() -> str:
+    """List all HTTP connections"""
+    connections = await _pool.fetch(_STMT_LIST)
+
+    if not connections:
+        return "No connections found"
+
+    return "HTTP Connections:\n" + "".join(map(_format_connection, connections))
+
+def _compiled_rules(connection):
+    """Compiled mapping rules for a connection row, reusing the cache while its rules are unchanged"""
+    mapping_rules = connection['mapping_rules'] or []
+    cached = _rules_cache.get(connection['id'])
+    if cached is not None and cached[0] == mapping_rules:
+        return cached[1]
+
+    # Incomplete rules are skipped, as in the JS backend
+    rules = [
+        (parse_jsonpath(rule['source_path']), rule['dest_field'])
+        for rule in mapping_rules
+        if rule.get('source_path') and rule.get('dest_field')
+    ]
+    _rules_cache[connection['id']] = (mapping_rules, rules)
+    return rules
+
+def _apply_rules(rules, data):
+    """Build the destination payload: each dest_field gets the first match of its source_path"""
+    mapped = {}
+    for expression, dest_field in rules:
+        matches = expression.find(data)
+        if matches:
+            mapped[dest_field] = matches[0].value
+    return mapped
+
+async def _warm_up(url):
+    """Connect the shared client to a host ahead of time; failures are left to the real request"""
+    try:
+        await _http.head(url, timeout=5.0)
+    except Exception:
+        pass
 
 @mcp.tool()
 async def execute_connection(connection_id: str) -> str:
     """Execute an HTTP connection to transfer data between endpoints"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    try:
+        # Get connection details and count the execution in the same round-trip
+        # (the pooled connection is released before the HTTP calls)
+        connection = await _pool.fetchrow(_STMT_BEGIN_EXECUTION, connection_id)
+    except Exception as e:
+        return f"Error executing connection: {str(e)}"
+
+    if not connection:
+        return f"Connection {connection_id} not found"
 
+    succeeded = False
     try:
-        # Get connection details
-        cursor.execute("SELECT * FROM connections WHERE id = %s", (connection_id,))
-        connection = cursor.fetchone()
+        rules = _compiled_rules(connection)
 
-        if not connection:
-            return f"Connection {connection_id} not found"
+        # Pass-through connections open a connection to the destination while the source
+        # request is in flight
+        warmup = None
+        if not rules and httpx.URL(connection['dest_url']).host != httpx.URL(connection['source_url']).host:
+            warmup = asyncio.create_task(_warm_up(connection['dest_url']))
 
         # Execute source request
-        async with httpx.AsyncClient() as client:
-            source_response = await client.request(
-                method=connection['source_method'],
-                url=connection['source_url'],
-                headers=connection['source_headers'] or {}
-            )
-
-        # Execute destination request
-        async with httpx.AsyncClient() as client:
-            dest_response = await client.request(
+        async with _http.stream(
+            method=connection['source_method'],
+            url=connection['source_url'],
+            headers=connection['source_headers'] or {}
+        ) as source_response:
+            if rules:
+                # Mapped payloads need the whole source document
+                await source_response.aread()
+                body = {'json': _apply_rules(rules, source_response.json())}
+            else:
+                # No rules: stream the source body through to the destination verbatim
+                body = {'content': source_response.aiter_bytes()}
+
+            # Never wait on the warm-up: a finished one has left its connection in the pool
+            if warmup is not None and not warmup.done():
+                warmup.cancel()
+
+            # Execute destination request
+            dest_response = await _http.request(
                 method=connection['dest_method'],
                 url=connection['dest_url'],
                 headers=connection['dest_headers'] or {},
-                content=source_response.text
+                **body
             )
 
-        # Update statistics
-        cursor.execute("""
-            UPDATE connections
-            SET last_executed = NOW(),
-                execution_count = execution_count + 1,
-                success_count = success_count + CASE WHEN %s < 400 THEN 1 ELSE 0 END,
-                error_count = error_count + CASE WHEN %s >= 400 THEN 1 ELSE 0 END
-            WHERE id = %s
-        """, (dest_response.status_code, dest_response.status_code, connection_id))
+        succeeded = dest_response.status_code < 400
+        result = f"Executed {connection_id}: {source_response.status_code} -> {dest_response.status_code}"
 
-        conn.commit()
+    except Exception as e:
+        result = f"Error executing connection: {str(e)}"
 
-        return f"Executed {connection_id}: {source_response.status_code} -> {dest_response.status_code}"
+    # Update statistics once, for success and error alike
+    await _pool.execute(_STMT_UPDATE_STATS, int(succeeded), int(not succeeded), connection_id)
 
-    except Exception as e:
-        # Update error count
-        cursor.execute("""
-            UPDATE connections
-            SET last_executed = NOW(),
-                execution_count = execution_count + 1,
-                error_count = error_count + 1
-            WHERE id = %s
-        """, (connection_id,))
-        conn.commit()
-        return f"Error executing connection: {str(e)}"
-    finally:
-        cursor.close()
-        conn.close()
+    return result
 
 @mcp.tool()
 async def delete_connection(connection_id: str) -> str:
     """Delete an HTTP connection"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("DELETE FROM connections WHERE id = %s", (connection_id,))
-        if cursor.rowcount > 0:
-            conn.commit()
+        status = await _pool.execute(_STMT_DELETE, connection_id)
+        _rules_cache.pop(connection_id, None)
+        if status != "DELETE 0":
             return f"Connection {connection_id} deleted"
         else:
             return f"Connection {connection_id} not found"
 
     except Exception as e:
-        conn.rollback()
         return f"Error deleting connection: {str(e)}"
-    finally:
-        cursor.close()
-        conn.close()
 
 if __name__ == "__main__":
-    # Initialize database
-    init_database()
-
-    # Run MCP server
+    # Run MCP server (the lifespan opens the pool and initializes the database)
     print("🚀 Starting simple MCP server...")
     mcp.run()
\ No newline at end of file
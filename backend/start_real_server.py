@@ -6,8 +6,7 @@ REAL SERVER STARTER - Start the actual HTTP server for testing
 import os
 import sys
 import subprocess
-from http.server import HTTPServer
-from api.index import handler
+import uvicorn
 
 def start_real_server():
     """Start the real HTTP server"""
@@ -26,13 +25,21 @@ def start_real_server():
     print()
 
     try:
-        # Start server on port 8000
-        server = HTTPServer(('localhost', 8000), handler)
-        print("✅ Server started successfully!")
+        print("✅ Server starting...")
         print("Press Ctrl+C to stop the server")
         print()
 
-        server.serve_forever()
+        # Start server on port 8000. The app is imported by uvicorn after DATABASE_URL is set;
+        # a single worker keeps every SSE subscriber in the same process as the broadcasts.
+        uvicorn.run(
+            "api.index:app",
+            host="localhost",
+            port=8000,
+            log_level="info",
+            loop="uvloop" if sys.platform != "win32" else "asyncio",
+            http="httptools",
+            workers=1
+        )
 
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")